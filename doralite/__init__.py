@@ -1,10 +1,12 @@
 import cftime
+import concurrent.futures
 import io
 import json
 import math
 import nc_time_axis
 import numpy as np
 import os
+import re
 import sqlite3
 import pandas as pd
 import requests
@@ -46,27 +48,31 @@ def is_overlapping(period_a, period_b):
     return start_a < end_b and end_a > start_b
 
 
+av_variables = [
+    "ann",
+    "01",
+    "02",
+    "03",
+    "04",
+    "05",
+    "06",
+    "07",
+    "08",
+    "09",
+    "10",
+    "11",
+    "12",
+]
+
+
 def infer_av_files(cat, subcat):
-    avlist = [
-        "ann",
-        "01",
-        "02",
-        "03",
-        "04",
-        "05",
-        "06",
-        "07",
-        "08",
-        "09",
-        "10",
-        "11",
-        "12",
-    ]
+    if len(subcat.vars) == 0:
+        return subcat
     for var in subcat.vars:
         _subcat = cat.search(variable_id=var)
         for realm in _subcat.realms:
             varentry = _subcat.search(realm=realm).df.iloc[0]
-            df = cat.search(variable_id=avlist).df
+            df = cat.search(variable_id=av_variables).df
             df = df[df["path"].str.contains(f"/{realm}/")]
             for k in [
                 "source_id",
@@ -112,8 +118,105 @@ def process_time_string(tstring):
     return timetup
 
 
-def load_dora_catalog(idnum, **kwargs):
-    return Dora_datastore(catalog(idnum).__dict__["_captured_init_args"][0], **kwargs)
+def load_dora_catalog(idnum, variable=None, realm=None, frequency=None, **kwargs):
+    return Dora_datastore(
+        catalog(
+            idnum, variable=variable, realm=realm, frequency=frequency
+        ).__dict__["_captured_init_args"][0],
+        **kwargs,
+    )
+
+
+shared_category_columns = [
+    "activity_id",
+    "institution_id",
+    "source_id",
+    "experiment_id",
+    "frequency",
+    "realm",
+    "table_id",
+    "member_id",
+    "grid_label",
+    "variable_id",
+    "chunk_freq",
+    "platform",
+    "target",
+    "cell_methods",
+    "dimensions",
+    "version_id",
+    "standard_name",
+]
+
+
+def share_categories(dfs, columns=None):
+    """Converts the requested columns of each DataFrame in `dfs` to a
+    categorical dtype whose dictionary is shared by all of them.
+
+    The string values common to many experiments (realms, frequencies,
+    variable names, ...) are then stored once rather than once per row
+    and per experiment. "unknown", the placeholder df_to_cat uses for
+    missing values, is always part of the dictionary. DataFrames are
+    modified in place."""
+    columns = shared_category_columns if columns is None else columns
+    for col in columns:
+        present = [df for df in dfs if col in df.columns]
+        if len(present) == 0 or not all(
+            pd.api.types.is_string_dtype(df[col].dtype)
+            or isinstance(df[col].dtype, pd.CategoricalDtype)
+            for df in present
+        ):
+            continue
+        values = {"unknown"}
+        for df in present:
+            values.update(df[col].dropna().unique())
+        dtype = pd.CategoricalDtype(sorted(values, key=str))
+        for df in present:
+            df[col] = df[col].astype(object).astype(dtype)
+    return dfs
+
+
+def load_dora_catalogs(
+    idnums,
+    max_workers=None,
+    key_column="dora_id",
+    variable=None,
+    realm=None,
+    frequency=None,
+    **kwargs,
+):
+    """Loads several Dora catalogs concurrently into a Dora_federation.
+
+    `idnums` is either an iterable of Dora ids, which are also used as the
+    experiment keys, or a dictionary of Dora ids keyed by a user-chosen
+    label. Each row is tagged with its experiment key in `key_column` and
+    the categorical columns share a single set of dictionaries. The
+    `variable`, `realm` and `frequency` selections are passed to catalog()
+    and applied to every catalog while it is read."""
+    if isinstance(idnums, dict):
+        keys, idnums = list(idnums.keys()), list(idnums.values())
+    else:
+        idnums = list(idnums)
+        keys = idnums
+
+    def _fetch(idnum):
+        return catalog(
+            idnum, variable=variable, realm=realm, frequency=frequency
+        ).__dict__["_captured_init_args"][0]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        sources = list(pool.map(_fetch, idnums))
+
+    for key, source in zip(keys, sources):
+        source["df"][key_column] = key
+    share_categories(
+        [x["df"] for x in sources], shared_category_columns + [key_column]
+    )
+
+    return Dora_federation(
+        {key: Dora_datastore(source, **kwargs) for key, source in zip(keys, sources)},
+        max_workers=max_workers,
+        key_column=key_column,
+    )
 
 
 class Dora_datastore(intake_esm.core.esm_datastore):
@@ -240,12 +343,46 @@ class Dora_datastore(intake_esm.core.esm_datastore):
         if dmget is True:
             call_dmget(_paths)
 
-        ds = xr.open_mfdataset(_paths, use_cftime=True)
+        return open_paths(_paths, list(self.df["time_range"].values))
 
-        alltimes = sorted([t for x in list(self.df["time_range"].values) for t in x])
-        ds.attrs["time_range"] = f"{alltimes[0].isoformat()},{alltimes[-1].isoformat()}"
+    def to_xarray_dict(
+        self,
+        dmget=True,
+        groupby=("realm", "frequency", "chunk_freq", "cell_methods"),
+        max_workers=None,
+        processes=False,
+        sep=".",
+    ):
+        """Opens the catalog as a dictionary of lazy xarray datasets, one per
+        combination of the `groupby` columns, keyed by their values joined
+        with `sep`. Unlike to_xarray, the catalog may span several realms
+        and chunk frequencies. Grouping by cell_methods keeps the av and ts
+        files returned by find() in separate datasets.
+
+        All files are recalled with a single dmget call before the groups
+        are opened concurrently on a thread pool, or on a process pool if
+        `processes` is True."""
+        assert len(self.df) > 0, "No datasets to open."
 
-        return ds
+        groups = {}
+        for key, df in self.df.groupby(list(groupby), observed=True):
+            key = key if isinstance(key, tuple) else (key,)
+            groups[sep.join([str(x) for x in key])] = (
+                sorted(df["path"].tolist()),
+                list(df["time_range"].values),
+            )
+
+        if dmget is True:
+            call_dmget(sorted([p for x in groups.values() for p in x[0]]))
+
+        executor = (
+            concurrent.futures.ProcessPoolExecutor
+            if processes is True
+            else concurrent.futures.ThreadPoolExecutor
+        )
+        with executor(max_workers=max_workers) as pool:
+            futures = {k: pool.submit(open_paths, *v) for k, v in groups.items()}
+            return {k: v.result() for k, v in futures.items()}
 
     def to_momgrid(self, dmget=True, to_xarray=True):
         res = mg.Gridset(self.to_xarray(dmget=dmget))
@@ -266,6 +403,92 @@ class Dora_datastore(intake_esm.core.esm_datastore):
         return self.info("chunk_freq")
 
 
+class Dora_federation:
+    """Collection of Dora_datastore catalogs keyed by experiment.
+
+    Operations are applied to each member catalog separately and return a
+    new Dora_federation, so member DataFrames are never concatenated or
+    re-validated unless `df` is requested explicitly."""
+
+    def __init__(self, catalogs, max_workers=None, key_column="dora_id"):
+        self.catalogs = dict(catalogs)
+        self.max_workers = max_workers
+        self.key_column = key_column
+
+    def __getitem__(self, key):
+        return self.catalogs[key]
+
+    def __iter__(self):
+        return iter(self.catalogs)
+
+    def __len__(self):
+        return len(self.catalogs)
+
+    def __repr__(self):
+        members = ", ".join(f"{k}: {len(v.df)} rows" for k, v in self.items())
+        return f"<Dora_federation ({members})>"
+
+    def keys(self):
+        return self.catalogs.keys()
+
+    def values(self):
+        return self.catalogs.values()
+
+    def items(self):
+        return self.catalogs.items()
+
+    def apply(self, func, dropempty=False):
+        """Calls `func` on each member catalog concurrently and returns the
+        results keyed by experiment"""
+        keys = list(self.keys())
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as pool:
+            results = list(pool.map(func, self.values()))
+        results = dict(zip(keys, results))
+        if dropempty is True:
+            results = {k: v for k, v in results.items() if len(v.df) > 0}
+        return results
+
+    def _federate(self, catalogs):
+        return Dora_federation(
+            catalogs, max_workers=self.max_workers, key_column=self.key_column
+        )
+
+    def find(self, dropempty=False, **kwargs):
+        """Runs Dora_datastore.find on every experiment and returns the
+        per-experiment results as a new Dora_federation"""
+        return self._federate(
+            self.apply(lambda x: x.find(**kwargs), dropempty=dropempty)
+        )
+
+    def search(self, dropempty=False, **query):
+        """Runs an intake-esm search on every experiment"""
+        return self._federate(
+            self.apply(lambda x: x.search(**query), dropempty=dropempty)
+        )
+
+    def info(self, attr):
+        return sorted(set(v for x in self.values() for v in x.info(attr)))
+
+    @property
+    def df(self):
+        """Single DataFrame of all member catalogs"""
+        return pd.concat([x.df for x in self.values()], ignore_index=True)
+
+    @property
+    def realms(self):
+        return self.info("realm")
+
+    @property
+    def vars(self):
+        return self.info("variable_id")
+
+    @property
+    def chunk_freqs(self):
+        return self.info("chunk_freq")
+
+
 def dora_metadata(expid):
     query = api + "api/info?id=" + str(expid)
     try:
@@ -277,13 +500,17 @@ def dora_metadata(expid):
     return x
 
 
-def catalog_raw(expid, decompress=True):
+def catalog_response(expid, stream=False):
     query = api + "api/catalog?id=" + str(expid) + "&compressed=true"
     try:
-        x = requests.get(url=query).content
+        x = requests.get(url=query, stream=stream)
     except:
-        x = requests.get(url=query, verify=False).content
-    x = BytesIO(x)
+        x = requests.get(url=query, verify=False, stream=stream)
+    return x
+
+
+def catalog_raw(expid, decompress=True):
+    x = BytesIO(catalog_response(expid).content)
     if decompress is True:
         with gzip.GzipFile(fileobj=x, mode="rb") as f:
             content = f.read()
@@ -292,10 +519,78 @@ def catalog_raw(expid, decompress=True):
     return content
 
 
-def catalog(expid):
-    df = pd.read_csv(
-        catalog_raw(expid, decompress=False), compression="gzip", low_memory=False
-    )
+catalog_categories = [x for x in shared_category_columns if x != "version_id"]
+
+catalog_dtypes = {
+    **{x: "category" for x in catalog_categories},
+    "path": str,
+    "time_range": str,
+}
+
+
+def read_catalog_csv(f, chunksize=100000, **filters):
+    """Reads a catalog CSV from the file-like object `f` in chunks of
+    `chunksize` rows, keeping only the rows whose columns match `filters`.
+
+    Filter values may be a single value or a list of values. The
+    climatology entries listed in `av_variables` are exempt from the
+    `variable_id` filter so that find() can still infer av files, and
+    are matched to a `realm` filter by their path, as in infer_av_files.
+    Low-cardinality columns are parsed
+    as categoricals and only the filtered chunks are retained, so peak
+    memory stays close to the size of the returned DataFrame."""
+    filters = {
+        k: [v] if isinstance(v, str) or not hasattr(v, "__iter__") else list(v)
+        for k, v in filters.items()
+        if v is not None
+    }
+    frames = []
+    categories = {}
+    for chunk in pd.read_csv(f, chunksize=chunksize, dtype=catalog_dtypes):
+        if len(filters) > 0:
+            av = chunk["variable_id"].isin(av_variables)
+            mask = pd.Series(True, index=chunk.index)
+            for k, v in filters.items():
+                match = chunk[k].isin(v)
+                if k == "variable_id":
+                    match |= av
+                elif k == "realm":
+                    pattern = "|".join([re.escape(f"/{x}/") for x in v])
+                    in_path = chunk["path"].str.contains(pattern, na=False)
+                    match = (match & ~av) | (in_path & av)
+                mask &= match
+            chunk = chunk[mask]
+        for col in catalog_categories:
+            if col in chunk.columns:
+                categories.setdefault(col, {"unknown"}).update(
+                    chunk[col].dropna().unique()
+                )
+        frames.append(chunk)
+
+    # Give every chunk the same dictionaries so that the categorical
+    # dtypes survive the concatenation
+    dtypes = {k: pd.CategoricalDtype(sorted(v)) for k, v in categories.items()}
+    for i, chunk in enumerate(frames):
+        frames[i] = chunk.astype(dtypes)
+    return pd.concat(frames, ignore_index=True)
+
+
+def catalog(expid, variable=None, realm=None, frequency=None, chunksize=100000):
+    """Loads the catalog of an experiment, optionally keeping only the
+    entries that match `variable`, `realm` and `frequency`.
+
+    The compressed response is decompressed and parsed as it streams
+    from the server rather than being held in memory in full."""
+    with catalog_response(expid, stream=True) as r:
+        r.raw.decode_content = True
+        with gzip.GzipFile(fileobj=r.raw, mode="rb") as f:
+            df = read_catalog_csv(
+                f,
+                chunksize=chunksize,
+                variable_id=variable,
+                realm=realm,
+                frequency=frequency,
+            )
     exp = dora_metadata(expid)
     return df_to_cat(df, label=exp["expName"])
 
@@ -311,6 +606,10 @@ def df_to_cat(df, label=""):
         "member_id",
         "chunk_freq",
     ]:
+        if isinstance(df[key].dtype, pd.CategoricalDtype) and (
+            "unknown" not in df[key].cat.categories
+        ):
+            df[key] = df[key].cat.add_categories("unknown")
         df[key] = df[key].fillna("unknown")
 
     esmcat_memory = {
@@ -395,6 +694,21 @@ def df_to_cat(df, label=""):
     return intake_esm.esm_datastore(esmcat_memory)
 
 
+def open_paths(paths, time_ranges):
+    """Opens a list of files as a single lazy dataset and records the
+    overall time range of the catalog entries as an attribute"""
+    ds = xr.open_mfdataset(paths, use_cftime=True)
+
+    alltimes = [t for x in time_ranges for t in process_time_string(x)]
+    alltimes = sorted([t for t in alltimes if t is not None])
+    if len(alltimes) > 0:
+        ds.attrs["time_range"] = (
+            f"{alltimes[0].isoformat()},{alltimes[-1].isoformat()}"
+        )
+
+    return ds
+
+
 def call_dmget(files):
     files = [files] if not isinstance(files, list) else files
     cmd = ["dmget"] + files
@@ -0,0 +1,63 @@
+import gzip
+import io
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("intake_esm")
+
+import doralite as dl
+
+
+def make_catalog_csv():
+    rows = []
+    for realm, var in [("atmos", "tas"), ("atmos", "pr"), ("ocean", "tos")]:
+        for variable_id, frequency in [(var, "mon"), ("ann", "mon"), ("01", "mon")]:
+            rows.append(
+                {
+                    "source_id": "am5",
+                    "experiment_id": "exp",
+                    "frequency": frequency,
+                    "table_id": None,
+                    "grid_label": "gr1",
+                    "realm": realm,
+                    "member_id": None,
+                    "chunk_freq": "5yr",
+                    "variable_id": variable_id,
+                    "time_range": "000101-000512",
+                    "cell_methods": "ts",
+                    "path": f"/pp/{realm}_month/{realm}/{variable_id}.nc",
+                }
+            )
+    df = pd.DataFrame(rows).drop_duplicates("path")
+    return gzip.compress(df.to_csv(index=False).encode())
+
+
+def read(**filters):
+    with gzip.GzipFile(fileobj=io.BytesIO(make_catalog_csv()), mode="rb") as f:
+        return dl.read_catalog_csv(f, chunksize=2, **filters)
+
+
+def test_read_catalog_csv_unfiltered():
+    df = read()
+    assert len(df) == 7
+    assert isinstance(df["realm"].dtype, pd.CategoricalDtype)
+    assert "unknown" in df["table_id"].cat.categories
+    assert df["path"].is_unique
+
+
+def test_read_catalog_csv_variable_keeps_av_rows():
+    df = read(variable_id="tas")
+    assert sorted(df["variable_id"]) == ["01", "01", "ann", "ann", "tas"]
+
+
+def test_read_catalog_csv_variable_and_realm():
+    df = read(variable_id="tas", realm="atmos")
+    assert sorted(df["variable_id"]) == ["01", "ann", "tas"]
+    assert set(df["realm"]) == {"atmos"}
+    assert all(df["path"].str.contains("/atmos/"))
+
+
+def test_read_catalog_csv_no_match_is_empty():
+    df = read(realm="atmos", frequency="yr")
+    assert len(df) == 0
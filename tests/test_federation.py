@@ -0,0 +1,84 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("intake_esm")
+
+import doralite as dl
+
+
+def make_catalog_df(expname, var="tas"):
+    rows = []
+    for variable_id, cell_methods, chunk_freq in [
+        (var, "ts", "5yr"),
+        ("ann", "av", "annual_5yr"),
+    ]:
+        rows.append(
+            {
+                "activity_id": "dev",
+                "institution_id": "NOAA-GFDL",
+                "source_id": "am5",
+                "experiment_id": expname,
+                "frequency": "mon",
+                "realm": "atmos",
+                "table_id": "Amon",
+                "member_id": "r1i1p1f1",
+                "grid_label": "gr1",
+                "variable_id": variable_id,
+                "time_range": "000101-000512",
+                "chunk_freq": chunk_freq,
+                "platform": "ncrc5",
+                "target": "prod",
+                "cell_methods": cell_methods,
+                "path": f"/pp/{expname}/atmos/{variable_id}.nc",
+                "dimensions": "time lat lon",
+                "version_id": "v1",
+                "standard_name": "air_temperature",
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def fake_catalog(monkeypatch):
+    variables = {1: "tas", 2: "tas", 3: "pr"}
+
+    def _catalog(expid, **kwargs):
+        df = make_catalog_df(f"exp{expid}", var=variables[expid])
+        return dl.df_to_cat(df, label=f"exp{expid}")
+
+    monkeypatch.setattr(dl, "catalog", _catalog)
+
+
+def test_federation_find_without_missing_values(fake_catalog):
+    fed = dl.load_dora_catalogs([1, 2])
+    assert isinstance(fed[1].df["table_id"].dtype, pd.CategoricalDtype)
+    assert fed[1].df["table_id"].dtype == fed[2].df["table_id"].dtype
+
+    res = fed.find(var="tas")
+    assert list(res.keys()) == [1, 2]
+    for key, cat in res.items():
+        assert sorted(cat.df["cell_methods"]) == ["av", "ts"]
+        assert set(cat.df["dora_id"]) == {key}
+
+
+def test_federation_find_member_without_variable(fake_catalog):
+    fed = dl.load_dora_catalogs([1, 3])
+
+    res = fed.find(var="tas")
+    assert list(res.keys()) == [1, 3]
+    assert len(res[3].df) == 0
+
+    res = fed.find(var="tas", dropempty=True)
+    assert list(res.keys()) == [1]
+    assert sorted(res[1].df["cell_methods"]) == ["av", "ts"]
+
+
+def test_load_dora_catalogs_with_labels(fake_catalog):
+    fed = dl.load_dora_catalogs({"control": 1, "historical": 2})
+    assert list(fed.keys()) == ["control", "historical"]
+    for key, cat in fed.items():
+        assert set(cat.df["dora_id"]) == {key}
+
+    res = fed.find(var="tas")
+    for key, cat in res.items():
+        assert set(cat.df["dora_id"]) == {key}
@@ -0,0 +1,71 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+xr = pytest.importorskip("xarray")
+pytest.importorskip("dask")
+pytest.importorskip("intake_esm")
+
+import doralite as dl
+
+
+def write_file(path, var, start, ntimes):
+    time = xr.DataArray(
+        np.arange(start, start + ntimes) * 30.0,
+        dims="time",
+        attrs={"units": "days since 0001-01-01", "calendar": "noleap"},
+    )
+    ds = xr.Dataset({var: ("time", np.arange(ntimes, dtype="f4"))}, {"time": time})
+    ds.to_netcdf(path)
+
+
+@pytest.fixture
+def datastore(tmp_path):
+    rows = []
+    for realm, var in [("atmos", "tas"), ("ocean", "tos")]:
+        for cell_methods, time_ranges in [
+            ("ts", ["000101-000512", "000601-001012"]),
+            ("av", ["0001-0005"]),
+        ]:
+            for n, time_range in enumerate(time_ranges):
+                ntimes = 60 if cell_methods == "ts" else 5
+                path = tmp_path / f"{realm}.{cell_methods}.{n}.nc"
+                write_file(path, var, n * ntimes, ntimes)
+                rows.append(
+                    {
+                        "source_id": "am5",
+                        "experiment_id": "exp",
+                        "frequency": "mon",
+                        "table_id": "unknown",
+                        "grid_label": "unknown",
+                        "realm": realm,
+                        "member_id": "unknown",
+                        "chunk_freq": "5yr",
+                        "variable_id": var,
+                        "time_range": time_range,
+                        "cell_methods": cell_methods,
+                        "path": str(path),
+                    }
+                )
+    cat = dl.df_to_cat(pd.DataFrame(rows), label="exp")
+    return dl.Dora_datastore(cat.__dict__["_captured_init_args"][0])
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_to_xarray_dict(datastore, processes):
+    res = datastore.to_xarray_dict(dmget=False, processes=processes)
+
+    assert sorted(res.keys()) == [
+        "atmos.mon.5yr.av",
+        "atmos.mon.5yr.ts",
+        "ocean.mon.5yr.av",
+        "ocean.mon.5yr.ts",
+    ]
+    for realm, var in [("atmos", "tas"), ("ocean", "tos")]:
+        ts = res[f"{realm}.mon.5yr.ts"]
+        av = res[f"{realm}.mon.5yr.av"]
+        assert var in ts and var in av
+        assert ts.sizes["time"] == 120
+        assert av.sizes["time"] == 5
+        assert ts.attrs["time_range"] == "0001-01-01T00:00:00,0010-12-31T00:00:00"
+        assert av.attrs["time_range"] == "0001-01-01T00:00:00,0005-12-31T00:00:00"